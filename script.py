@@ -6,10 +6,20 @@ Allows users to create, manage, and share custom prompts with slash command supp
 import gradio as gr
 import json
 import os
+import re
+import sqlite3
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from modules import chat, shared, ui_chat
+from modules.logging_colors import logger
 from modules.text_generation import generate_reply
 
 # Extension parameters
@@ -19,106 +29,211 @@ params = {
 }
 
 # Global variables
-prompts_file = Path("extensions/prompts/prompts.json")
-prompts_data = {}
+prompts_db = Path("extensions/prompts/prompts.db")
+prompts_file = Path("extensions/prompts/prompts.json")  # Legacy storage, imported into prompts_db
+prompt_fields = ('title', 'command', 'content', 'creator', 'created', 'modified')  # Column order of the prompts table
+prompts_data = {}  # In-memory copy of the prompts table, keyed by title
+_command_index: dict[str, dict] = {}  # command -> prompt, rebuilt whenever prompts_data changes
+_command_to_title: dict[str, str] = {}  # command -> title, used for duplicate checks
+_command_regex: re.Pattern | None = None  # matches "<command>[ <input>]", None when there are no prompts
+_placeholder_commands: set[str] = set()  # commands whose content contains {input}
+_accessible_json_cache: str | None = None
+_available_commands_cache: str | None = None
+_conn = None
+_loaded = False
+_db_lock = threading.Lock()
+refresh_interval = 0.05  # seconds; repeated refreshes with no changes inside this window are skipped
 current_user = "default_user"  # In a real implementation, this would be dynamic
 
 def setup():
-    """Initialize the extension and load existing prompts"""
-    global prompts_data
+    """Initialize the extension; prompts are loaded from the database on first use"""
+    global _loaded
+    _loaded = False
+
+def _ensure_loaded():
+    """Open the database and load existing prompts, once"""
+    if _loaded:
+        return
+    
+    with _db_lock:
+        if not _loaded:
+            _load_prompts()
+
+def _load_prompts():
+    """Open the database and load existing prompts into prompts_data"""
+    global prompts_data, _conn, _loaded
+    
+    if _conn is not None:
+        _conn.close()
     
     # Create extension directory if it doesn't exist
     extension_dir = Path("extensions/prompts")
     extension_dir.mkdir(exist_ok=True)
     
-    # Load existing prompts or create empty file
+    _conn = sqlite3.connect(prompts_db, check_same_thread=False)
+    _conn.row_factory = sqlite3.Row
+    _conn.execute("PRAGMA journal_mode=WAL")
+    with _conn:
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS prompts ("
+            "title TEXT PRIMARY KEY, command TEXT UNIQUE, content TEXT, "
+            "creator TEXT, created TEXT, modified TEXT)"
+        )
+    
+    # Import prompts saved by older versions of the extension
     if prompts_file.exists():
-        try:
-            with open(prompts_file, 'r') as f:
-                prompts_data = json.load(f)
-        except:
-            prompts_data = {}
+        _import_prompts_file()
+    
+    rows = _conn.execute("SELECT title, command, content, creator, created, modified FROM prompts ORDER BY rowid")
+    prompts_data = {row['title']: dict(row) for row in rows}
+    _rebuild_index()
+    _loaded = True
+
+def _import_prompts_file():
+    """Copy prompts from the legacy JSON file into the database, then move the file aside"""
+    try:
+        legacy_data = _json_loads(prompts_file.read_bytes())
+    except (json.JSONDecodeError, OSError) as e:
+        logger.error(f"Could not import prompts from {prompts_file}, leaving it in place: {e}")
+        return
+    
+    with _conn:
+        _conn.executemany(
+            "INSERT OR IGNORE INTO prompts (title, command, content, creator, created, modified) VALUES (?, ?, ?, ?, ?, ?)",
+            [tuple(prompt.get(field) for field in prompt_fields) for prompt in legacy_data.values()]
+        )
+    os.replace(prompts_file, prompts_file.with_suffix('.json.bak'))
+
+def _rebuild_index():
+    """Rebuild the command lookup index from prompts_data and drop derived caches"""
+    global _command_index, _command_to_title, _command_regex, _placeholder_commands
+    global _accessible_json_cache, _available_commands_cache
+    _command_index = {prompt['command']: prompt for prompt in prompts_data.values()}
+    _command_to_title = {command: prompt['title'] for command, prompt in _command_index.items()}
+    _placeholder_commands = {command for command, prompt in _command_index.items() if '{input}' in prompt['content']}
+    
+    if _command_index:
+        # Longest first, so a command is never shadowed by one of its prefixes
+        alternation = '|'.join(re.escape(command) for command in sorted(_command_index, key=len, reverse=True))
+        _command_regex = re.compile(rf'({alternation})(?: (.*))?', re.DOTALL)
     else:
-        prompts_data = {}
-        save_prompts()
+        _command_regex = None
+    _accessible_json_cache = None
+    _available_commands_cache = None
 
-def save_prompts():
-    """Save prompts to JSON file"""
-    with open(prompts_file, 'w') as f:
-        json.dump(prompts_data, f, indent=2)
+def _json_loads(data):
+    """Parse JSON, using orjson when it is available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(obj):
+    """Serialize to a JSON string, using orjson when it is available"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
 
 def create_prompt(title, command, content):
     """Create a new prompt"""
+    _ensure_loaded()
     if not title or not command or not content:
-        return "Error: All fields are required", get_prompts_list()
+        return "Error: All fields are required"
     
     # Ensure command starts with /
     if not command.startswith('/'):
         command = '/' + command
     
     # Check if command already exists
-    for prompt_id, prompt in prompts_data.items():
-        if prompt['command'] == command and prompt_id != title:
-            return f"Error: Command {command} already exists", get_prompts_list()
+    existing = _command_to_title.get(command)
+    if existing and existing != title:
+        return f"Error: Command {command} already exists"
     
-    prompts_data[title] = {
+    now = datetime.now().isoformat()
+    prompt = {
         'title': title,
         'command': command,
         'content': content,
         'creator': current_user,
-        'created': datetime.now().isoformat(),
-        'modified': datetime.now().isoformat()
+        'created': now,
+        'modified': now
     }
     
-    save_prompts()
-    return f"Prompt '{title}' created successfully!", get_prompts_list()
+    with _db_lock, _conn:
+        _conn.execute(
+            "INSERT INTO prompts (title, command, content, creator, created, modified) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(title) DO UPDATE SET command=excluded.command, content=excluded.content, "
+            "creator=excluded.creator, created=excluded.created, modified=excluded.modified",
+            [prompt[field] for field in prompt_fields]
+        )
+        prompts_data[title] = prompt
+        _rebuild_index()
+    
+    return f"Prompt '{title}' created successfully!"
 
 def update_prompt(selected_prompt, title, command, content):
     """Update an existing prompt"""
+    _ensure_loaded()
     if not selected_prompt or selected_prompt not in prompts_data:
-        return "Error: Please select a prompt to update", get_prompts_list()
+        return "Error: Please select a prompt to update"
     
     if not title or not command or not content:
-        return "Error: All fields are required", get_prompts_list()
+        return "Error: All fields are required"
+    
+    if title != selected_prompt and title in prompts_data:
+        return f"Error: Prompt '{title}' already exists"
     
     # Ensure command starts with /
     if not command.startswith('/'):
         command = '/' + command
     
     # Check if command already exists (excluding current prompt)
-    for prompt_id, prompt in prompts_data.items():
-        if prompt['command'] == command and prompt_id != selected_prompt:
-            return f"Error: Command {command} already exists", get_prompts_list()
-    
-    # If title changed, we need to update the key
-    if selected_prompt != title:
-        prompts_data[title] = prompts_data.pop(selected_prompt)
+    existing = _command_to_title.get(command)
+    if existing and existing != selected_prompt:
+        return f"Error: Command {command} already exists"
     
-    prompts_data[title].update({
-        'title': title,
-        'command': command,
-        'content': content,
-        'modified': datetime.now().isoformat()
-    })
+    modified = datetime.now().isoformat()
+    with _db_lock, _conn:
+        _conn.execute(
+            "UPDATE prompts SET title=?, command=?, content=?, modified=? WHERE title=?",
+            (title, command, content, modified, selected_prompt)
+        )
+        
+        prompts_data[title] = {
+            **prompts_data[selected_prompt],
+            'title': title,
+            'command': command,
+            'content': content,
+            'modified': modified
+        }
+        
+        # If title changed, drop the entry under the old key
+        if selected_prompt != title:
+            del prompts_data[selected_prompt]
+        _rebuild_index()
     
-    save_prompts()
-    return f"Prompt '{title}' updated successfully!", get_prompts_list()
+    return f"Prompt '{title}' updated successfully!"
 
 def delete_prompt(selected_prompt):
     """Delete a prompt"""
+    _ensure_loaded()
     if not selected_prompt or selected_prompt not in prompts_data:
-        return "Error: Please select a prompt to delete", get_prompts_list()
+        return "Error: Please select a prompt to delete"
     
-    del prompts_data[selected_prompt]
-    save_prompts()
-    return f"Prompt '{selected_prompt}' deleted successfully!", get_prompts_list()
+    with _db_lock, _conn:
+        _conn.execute("DELETE FROM prompts WHERE title=?", (selected_prompt,))
+        del prompts_data[selected_prompt]
+        _rebuild_index()
+    
+    return f"Prompt '{selected_prompt}' deleted successfully!"
 
 def get_prompts_list():
     """Get list of all prompts"""
+    _ensure_loaded()
     return list(prompts_data.keys())
 
 def load_prompt_details(selected_prompt):
     """Load details of selected prompt for editing"""
+    _ensure_loaded()
     if not selected_prompt or selected_prompt not in prompts_data:
         return "", "", ""
     
@@ -127,44 +242,61 @@ def load_prompt_details(selected_prompt):
 
 def get_available_commands():
     """Get list of available commands for display"""
-    commands = []
-    for prompt in prompts_data.values():
-        commands.append(f"{prompt['command']} - {prompt['title']}")
-    return "\n".join(commands) if commands else "No prompts available"
+    global _available_commands_cache
+    _ensure_loaded()
+    if _available_commands_cache is not None:
+        return _available_commands_cache
+    
+    _available_commands_cache = (
+        "\n".join(f"{prompt['command']} - {prompt['title']}" for prompt in prompts_data.values())
+        or "No prompts available"
+    )
+    return _available_commands_cache
 
 def get_accessible_prompts_json():
     """Get all prompts as JSON for JavaScript"""
+    global _accessible_json_cache
+    _ensure_loaded()
+    if _accessible_json_cache is not None:
+        return _accessible_json_cache
+    
     accessible = {}
-    for title, prompt in prompts_data.items():
-        accessible[prompt['command']] = {
+    for command, prompt in _command_index.items():
+        accessible[command] = {
             'title': prompt['title'],
             'content': prompt['content'],
             'command': prompt['command']
         }
-    return json.dumps(accessible)
+    _accessible_json_cache = _json_dumps(accessible)
+    return _accessible_json_cache
 
 def chat_input_modifier(text, visible_text, state):
     """Process slash commands in chat input"""
-    if text.startswith('/'):
-        # Extract command
-        parts = text.split(' ', 1)
-        command = parts[0]
-        user_input = parts[1] if len(parts) > 1 else ""
-        
-        # Find matching prompt
-        for prompt in prompts_data.values():
-            if prompt['command'] == command:
-                # Replace {input} placeholder with user input if present
-                prompt_content = prompt['content']
-                if '{input}' in prompt_content and user_input:
-                    prompt_content = prompt_content.replace('{input}', user_input)
-                elif user_input:
-                    # If no placeholder, append user input
-                    prompt_content = f"{prompt_content}\n\n{user_input}"
-                
-                return prompt_content, prompt_content
+    # Fast path: this runs for every chat message
+    if not text or text[0] != '/':
+        return text, visible_text
+    
+    _ensure_loaded()
+    if not _command_index:
+        return text, visible_text
+    
+    # Extract command and find matching prompt
+    match = _command_regex.fullmatch(text)
+    if not match:
+        return text, visible_text
     
-    return text, visible_text
+    command = match.group(1)
+    user_input = match.group(2) or ""
+    
+    # Replace {input} placeholder with user input if present
+    prompt_content = _command_index[command]['content']
+    if command in _placeholder_commands and user_input:
+        prompt_content = prompt_content.replace('{input}', user_input)
+    elif user_input:
+        # If no placeholder, append user input
+        prompt_content = f"{prompt_content}\n\n{user_input}"
+    
+    return prompt_content, prompt_content
 
 def ui():
     """Create the UI for the Prompts tab"""
@@ -172,18 +304,21 @@ def ui():
         gr.Markdown("# Prompts Management")
         gr.Markdown("Create, manage, and share custom prompts with slash command support.")
         
-        # Hidden component to store prompts data for JavaScript
+        # Hidden component to store prompts data for JavaScript; filled in when the page loads
         prompts_json_store = gr.Textbox(
-            value=get_accessible_prompts_json(),
+            value="",
             visible=False,
             elem_id="prompts-data-store"
         )
         
+        # Per-session record of the JSON last sent to the browser and when
+        refresh_state = gr.State({'json': None, 'timestamp': 0.0})
+        
         with gr.Row():
             with gr.Column(scale=1):
                 gr.Markdown("### Available Commands")
                 available_commands = gr.Textbox(
-                    value=get_available_commands(),
+                    value="",
                     label="Your accessible prompts",
                     lines=10,
                     interactive=False
@@ -196,7 +331,7 @@ def ui():
                 
                 with gr.Row():
                     prompts_dropdown = gr.Dropdown(
-                        choices=get_prompts_list(),
+                        choices=[],
                         label="Select prompt to edit",
                         interactive=True
                     )
@@ -239,12 +374,51 @@ def ui():
         """)
         
         # Event handlers
-        def refresh_ui():
-            return get_available_commands(), gr.update(choices=get_prompts_list()), get_accessible_prompts_json()
+        def refresh_ui(state):
+            now = time.monotonic()
+            prompts_json = get_accessible_prompts_json()
+            unchanged = prompts_json == state['json']
+            if unchanged and now - state['timestamp'] < refresh_interval:
+                return gr.update(), gr.update(), gr.update(), state
+            
+            # Only rewrite the data store when its content changed, so the page isn't re-rendered needlessly
+            return (
+                get_available_commands(),
+                gr.update(choices=get_prompts_list()),
+                gr.update() if unchanged else prompts_json,
+                {'json': prompts_json, 'timestamp': now}
+            )
+        
+        # Mutators return their status together with the refreshed UI, in a single round-trip
+        def create_and_refresh(title, command, content, state):
+            return create_prompt(title, command, content), *refresh_ui(state)
+        
+        def update_and_refresh(selected_prompt, title, command, content, state):
+            return update_prompt(selected_prompt, title, command, content), *refresh_ui(state)
+        
+        def delete_and_refresh(selected_prompt, state):
+            return delete_prompt(selected_prompt), *refresh_ui(state)
+        
+        refresh_outputs = [available_commands, prompts_dropdown, prompts_json_store, refresh_state]
+        
+        # Fill in prompts data once the page loads instead of while building the UI
+        shared.gradio['interface'].load(
+            refresh_ui,
+            inputs=[refresh_state],
+            outputs=refresh_outputs
+        )
         
         refresh_btn.click(
             refresh_ui,
-            outputs=[available_commands, prompts_dropdown, prompts_json_store]
+            inputs=[refresh_state],
+            outputs=refresh_outputs
+        )
+        
+        # Hand new prompts data straight to the autocomplete script
+        prompts_json_store.change(
+            None,
+            inputs=[prompts_json_store],
+            js="(jsonStr) => { window.__refreshPromptsData && window.__refreshPromptsData(jsonStr); }"
         )
         
         load_btn.click(
@@ -254,30 +428,21 @@ def ui():
         )
         
         create_btn.click(
-            create_prompt,
-            inputs=[title_input, command_input, content_input],
-            outputs=[status_output, prompts_dropdown]
-        ).then(
-            refresh_ui,
-            outputs=[available_commands, prompts_dropdown, prompts_json_store]
+            create_and_refresh,
+            inputs=[title_input, command_input, content_input, refresh_state],
+            outputs=[status_output] + refresh_outputs
         )
         
         update_btn.click(
-            update_prompt,
-            inputs=[prompts_dropdown, title_input, command_input, content_input],
-            outputs=[status_output, prompts_dropdown]
-        ).then(
-            refresh_ui,
-            outputs=[available_commands, prompts_dropdown, prompts_json_store]
+            update_and_refresh,
+            inputs=[prompts_dropdown, title_input, command_input, content_input, refresh_state],
+            outputs=[status_output] + refresh_outputs
         )
         
         delete_btn.click(
-            delete_prompt,
-            inputs=[prompts_dropdown],
-            outputs=[status_output, prompts_dropdown]
-        ).then(
-            refresh_ui,
-            outputs=[available_commands, prompts_dropdown, prompts_json_store]
+            delete_and_refresh,
+            inputs=[prompts_dropdown, refresh_state],
+            outputs=[status_output] + refresh_outputs
         )
 
 def custom_css():
@@ -346,6 +511,25 @@ def custom_js():
         let autocompleteContainer = null;
         let selectedIndex = -1;
         let promptsData = {};
+        let sortedCommands = [];  // [lowercase command, command] pairs, sorted for prefix search
+        let lastJsonStr = null;
+        
+        // Load prompts data, skipping the parse when nothing changed
+        const updatePromptsData = (jsonStr) => {
+            if (!jsonStr || jsonStr === lastJsonStr) return;
+            try {
+                promptsData = JSON.parse(jsonStr);
+                sortedCommands = Object.keys(promptsData)
+                    .map(cmd => [cmd.toLowerCase(), cmd])
+                    .sort((a, b) => (a[0] < b[0] ? -1 : a[0] > b[0] ? 1 : 0));
+                lastJsonStr = jsonStr;
+            } catch (e) {
+                console.error('Failed to parse prompts data:', e);
+            }
+        };
+        
+        // Called by the prompts_json_store change event whenever the server sends new data
+        window.__refreshPromptsData = updatePromptsData;
         
         // Wait for the page to load
         const initPromptAutocomplete = () => {
@@ -359,104 +543,165 @@ def custom_js():
             // Create autocomplete container
             autocompleteContainer = document.createElement('div');
             autocompleteContainer.id = 'prompts-autocomplete';
+            autocompleteContainer.style.display = 'none';
             document.body.appendChild(autocompleteContainer);
             
-            // Load prompts data
-            const updatePromptsData = () => {
-                const dataStore = document.querySelector('#prompts-data-store textarea');
-                if (dataStore && dataStore.value) {
-                    try {
-                        promptsData = JSON.parse(dataStore.value);
-                    } catch (e) {
-                        console.error('Failed to parse prompts data:', e);
-                    }
+            // Build the suggestion rows once; showAutocomplete only fills them in
+            const maxSuggestions = 10;
+            const suggestionEls = [];
+            let visibleCount = 0;
+            for (let index = 0; index < maxSuggestions; index++) {
+                const el = document.createElement('div');
+                el.className = 'prompt-suggestion';
+                el.dataset.index = index;
+                el.style.display = 'none';
+                
+                const commandEl = document.createElement('span');
+                commandEl.className = 'prompt-command-inline';
+                const titleEl = document.createElement('span');
+                titleEl.className = 'prompt-title';
+                el.append(commandEl, titleEl);
+                
+                autocompleteContainer.appendChild(el);
+                suggestionEls.push(el);
+            }
+            
+            // Single click handler for all rows
+            autocompleteContainer.addEventListener('click', (e) => {
+                const el = e.target.closest('.prompt-suggestion');
+                if (el) {
+                    selectPrompt(el.dataset.command);
                 }
-            };
+            });
             
             // Initial load
-            updatePromptsData();
-            
-            // Update when data changes
-            const observer = new MutationObserver(updatePromptsData);
             const dataStore = document.querySelector('#prompts-data-store textarea');
             if (dataStore) {
-                observer.observe(dataStore, { attributes: true, childList: true, characterData: true });
+                updatePromptsData(dataStore.value);
             }
             
+            // Hidden mirror element used to measure the caret position, created once and reused
+            const mirror = document.createElement('div');
+            const mirrorCaret = document.createElement('span');
+            mirror.style.position = 'absolute';
+            mirror.style.top = '0';
+            mirror.style.left = '0';
+            mirror.style.visibility = 'hidden';
+            mirror.style.whiteSpace = 'pre-wrap';
+            document.body.appendChild(mirror);
+            
+            // Copy the text styles of the chat input into the mirror
+            const syncMirrorStyle = () => {
+                const style = getComputedStyle(chatInput);
+                const properties = ['font', 'letterSpacing', 'wordSpacing', 'textIndent', 'textTransform'];
+                
+                properties.forEach(prop => {
+                    mirror.style[prop] = style[prop];
+                });
+                
+                mirror.style.width = chatInput.offsetWidth + 'px';
+            };
+            syncMirrorStyle();
+            
+            // Bounding rect of the chat input, cleared whenever it may have moved
+            let chatInputRect = null;
+            const invalidateLayout = () => {
+                chatInputRect = null;
+            };
+            
+            window.addEventListener('scroll', invalidateLayout, { capture: true, passive: true });
+            window.addEventListener('resize', () => {
+                invalidateLayout();
+                syncMirrorStyle();
+            });
+            new ResizeObserver(() => {
+                invalidateLayout();
+                syncMirrorStyle();
+            }).observe(chatInput);
+            
             // Position autocomplete dropdown
             const positionAutocomplete = () => {
-                const rect = chatInput.getBoundingClientRect();
+                if (!chatInputRect) {
+                    chatInputRect = chatInput.getBoundingClientRect();
+                }
                 const caretCoords = getCaretCoordinates(chatInput, chatInput.selectionEnd);
                 
-                autocompleteContainer.style.left = (rect.left + caretCoords.left) + 'px';
-                autocompleteContainer.style.top = (rect.top + caretCoords.top + 20) + 'px';
+                autocompleteContainer.style.left = (chatInputRect.left + caretCoords.left) + 'px';
+                autocompleteContainer.style.top = (chatInputRect.top + caretCoords.top + 20) + 'px';
             };
             
             // Get caret coordinates (simplified version)
             const getCaretCoordinates = (element, position) => {
-                const div = document.createElement('div');
-                const style = getComputedStyle(element);
-                const properties = ['font', 'letterSpacing', 'wordSpacing', 'textIndent', 'textTransform'];
-                
-                properties.forEach(prop => {
-                    div.style[prop] = style[prop];
-                });
-                
-                div.style.position = 'absolute';
-                div.style.visibility = 'hidden';
-                div.style.whiteSpace = 'pre-wrap';
-                div.style.width = element.offsetWidth + 'px';
-                
-                div.textContent = element.value.substring(0, position);
-                document.body.appendChild(div);
-                
-                const span = document.createElement('span');
-                span.textContent = element.value.substring(position) || '.';
-                div.appendChild(span);
+                mirror.textContent = element.value.substring(0, position);
+                mirrorCaret.textContent = element.value.substring(position) || '.';
+                mirror.appendChild(mirrorCaret);
                 
                 const coords = {
-                    top: span.offsetTop,
-                    left: span.offsetLeft
+                    top: mirrorCaret.offsetTop,
+                    left: mirrorCaret.offsetLeft
                 };
                 
-                document.body.removeChild(div);
+                mirror.textContent = '';
                 return coords;
             };
             
+            // Find up to `limit` commands starting with the typed filter
+            const findCommands = (filter, limit) => {
+                const prefix = '/' + filter.toLowerCase();
+                
+                // Binary search for the first command not sorting before the prefix
+                let low = 0;
+                let high = sortedCommands.length;
+                while (low < high) {
+                    const mid = (low + high) >> 1;
+                    if (sortedCommands[mid][0] < prefix) {
+                        low = mid + 1;
+                    } else {
+                        high = mid;
+                    }
+                }
+                
+                const matches = [];
+                for (let i = low; i < sortedCommands.length && matches.length < limit; i++) {
+                    if (!sortedCommands[i][0].startsWith(prefix)) break;
+                    matches.push(sortedCommands[i][1]);
+                }
+                return matches;
+            };
+            
             // Show autocomplete
             const showAutocomplete = (filter = '') => {
-                const suggestions = Object.entries(promptsData)
-                    .filter(([cmd, data]) => cmd.toLowerCase().includes(filter.toLowerCase()))
-                    .slice(0, 10);
+                const suggestions = findCommands(filter, maxSuggestions);
                 
                 if (suggestions.length === 0) {
                     hideAutocomplete();
                     return;
                 }
                 
-                autocompleteContainer.innerHTML = suggestions.map(([cmd, data], index) => `
-                    <div class="prompt-suggestion" data-index="${index}" data-command="${cmd}">
-                        <span class="prompt-command-inline">${cmd}</span>
-                        <span class="prompt-title">${data.title}</span>
-                    </div>
-                `).join('');
+                suggestionEls.forEach((el, index) => {
+                    if (index >= suggestions.length) {
+                        el.style.display = 'none';
+                        return;
+                    }
+                    
+                    const cmd = suggestions[index];
+                    const title = promptsData[cmd].title;
+                    el.dataset.command = cmd;
+                    if (el.firstChild.textContent !== cmd) el.firstChild.textContent = cmd;
+                    if (el.lastChild.textContent !== title) el.lastChild.textContent = title;
+                    el.style.display = '';
+                });
+                visibleCount = suggestions.length;
                 
                 autocompleteContainer.style.display = 'block';
                 positionAutocomplete();
-                selectedIndex = -1;
-                
-                // Add click handlers
-                autocompleteContainer.querySelectorAll('.prompt-suggestion').forEach(el => {
-                    el.addEventListener('click', () => {
-                        selectPrompt(el.dataset.command);
-                    });
-                });
+                setSelection(-1);
             };
             
             // Hide autocomplete
             const hideAutocomplete = () => {
                 autocompleteContainer.style.display = 'none';
-                selectedIndex = -1;
+                setSelection(-1);
             };
             
             // Select prompt
@@ -470,10 +715,12 @@ def custom_js():
                 }
             };
             
-            // Handle input
-            chatInput.addEventListener('input', (e) => {
-                const value = e.target.value;
-                const cursorPosition = e.target.selectionStart;
+            // Handle input, at most once per animation frame
+            let inputFrame = 0;
+            const handleInput = () => {
+                inputFrame = 0;
+                const value = chatInput.value;
+                const cursorPosition = chatInput.selectionStart;
                 
                 // Check if we're at the start or after a newline
                 const textBefore = value.substring(0, cursorPosition);
@@ -486,31 +733,33 @@ def custom_js():
                 } else {
                     hideAutocomplete();
                 }
+            };
+            
+            chatInput.addEventListener('input', () => {
+                if (!inputFrame) {
+                    inputFrame = requestAnimationFrame(handleInput);
+                }
             });
             
             // Handle keyboard navigation
             chatInput.addEventListener('keydown', (e) => {
                 if (autocompleteContainer.style.display === 'none') return;
                 
-                const suggestions = autocompleteContainer.querySelectorAll('.prompt-suggestion');
-                
                 switch(e.key) {
                     case 'ArrowDown':
                         e.preventDefault();
-                        selectedIndex = Math.min(selectedIndex + 1, suggestions.length - 1);
-                        updateSelection(suggestions);
+                        setSelection(Math.min(selectedIndex + 1, visibleCount - 1));
                         break;
                         
                     case 'ArrowUp':
                         e.preventDefault();
-                        selectedIndex = Math.max(selectedIndex - 1, -1);
-                        updateSelection(suggestions);
+                        setSelection(Math.max(selectedIndex - 1, -1));
                         break;
                         
                     case 'Enter':
                         if (selectedIndex >= 0) {
                             e.preventDefault();
-                            const selected = suggestions[selectedIndex];
+                            const selected = suggestionEls[selectedIndex];
                             selectPrompt(selected.dataset.command);
                         }
                         break;
@@ -521,11 +770,16 @@ def custom_js():
                 }
             });
             
-            // Update visual selection
-            const updateSelection = (suggestions) => {
-                suggestions.forEach((el, index) => {
-                    el.classList.toggle('selected', index === selectedIndex);
-                });
+            // Move the visual selection, touching only the old and new rows
+            const setSelection = (index) => {
+                if (index === selectedIndex) return;
+                if (selectedIndex >= 0) {
+                    suggestionEls[selectedIndex].classList.remove('selected');
+                }
+                selectedIndex = index;
+                if (selectedIndex >= 0) {
+                    suggestionEls[selectedIndex].classList.add('selected');
+                }
             };
             
             // Hide on click outside
@@ -537,6 +791,8 @@ def custom_js():
             
             // Handle focus
             chatInput.addEventListener('focus', (e) => {
+                invalidateLayout();
+                syncMirrorStyle();
                 if (e.target.value.startsWith('/')) {
                     showAutocomplete(e.target.value.substring(1));
                 }